@@ -2,22 +2,31 @@
 Flask application factory
 """
 
+import logging
 import time
 import requests
 from flask import Flask
 from flask_cors import CORS
 from .database import init_redis, wait_for_redis
 from .constants import (
-    SECRET_KEY, REDIS_URL, BOT_TOKEN, WEBHOOK_URL, TELEGRAM_API_BASE
+    SECRET_KEY, REDIS_URL, BOT_TOKEN, WEBHOOK_URL, TELEGRAM_API_BASE,
+    FLASK_DEBUG
 )
 
 
+# Module-level session so webhook setup reuses one HTTPS connection
+_SESSION = requests.Session()
+
+# Fixed endpoint - built once instead of per call
+_SET_WEBHOOK_URL = f"{TELEGRAM_API_BASE}/setWebhook"
+
+
 def set_webhook(bot_token: str, webhook_url: str):
     """Set Telegram bot webhook on startup"""
     try:
-        url = f"{TELEGRAM_API_BASE}/setWebhook"
+        url = _SET_WEBHOOK_URL
         payload = {"url": webhook_url}
-        response = requests.post(url, json=payload, timeout=10)
+        response = _SESSION.post(url, json=payload, timeout=10)
 
         if response.status_code == 200:
             result = response.json()
@@ -33,6 +42,13 @@ def set_webhook(bot_token: str, webhook_url: str):
 
 def create_app():
     """Create and configure the Flask application"""
+    # Configure logging once for the whole app - debug logs (and their
+    # string formatting) are skipped entirely at INFO level
+    logging.basicConfig(
+        level=logging.DEBUG if FLASK_DEBUG else logging.INFO,
+        format='%(asctime)s %(name)s %(levelname)s: %(message)s'
+    )
+
     app = Flask(__name__)
 
     # Configuration
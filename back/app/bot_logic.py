@@ -4,12 +4,51 @@ Separate from WebApp functionality - handles chat bot interactions
 """
 
 import json
-import requests
-from typing import Optional, Dict, Any
+import logging
+import random
+import time
+import httpx
+from typing import Optional, Dict, Any, Union
 from .telegram_utils import Message, parse_telegram_update
 from .database import UserManager
 from .constants import TELEGRAM_API_BASE, FRONT_URL, SHUMILOV_WEBSITE
 
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    # Fall back to stdlib json when orjson isn't installed
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+# Payloads are pre-encoded with _json_dumps, so the content type is set
+# explicitly instead of letting the HTTP client serialize with stdlib json
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+logger = logging.getLogger(__name__)
+
+# Transient Bot API failures worth retrying (429 = rate limit, 5xx = server)
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Static /start reply pieces - built (and serialized) once at import time
+# instead of on every message
+_WELCOME_TEMPLATE = """
+👋 Hello, <b>{name}</b>!
+
+Welcome to our Telegram App Template!
+""".strip()
+
+_START_KEYBOARD_JSON = _json_dumps({
+    "inline_keyboard": [
+        [{"text": "🚀 Open Web App", "web_app": {"url": FRONT_URL}}],
+        [{"text": "👨‍💻 About me", "url": SHUMILOV_WEBSITE}]
+    ]
+}).decode()
+
 
 class TelegramBot:
     """Telegram Bot API wrapper and message handler"""
@@ -17,105 +56,156 @@ class TelegramBot:
     def __init__(self, bot_token: str):
         self.bot_token = bot_token
         self.api_base = TELEGRAM_API_BASE
+        # HTTP/2 client - keeps the connection to api.telegram.org alive
+        # and multiplexes concurrent calls (e.g. delete + send for one
+        # update) over a single TCP+TLS connection
+        self.session = httpx.Client(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+        )
+        # Endpoint URLs are fixed per token - build them once here
+        self._url_send_message = f"{self.api_base}/sendMessage"
+        self._url_send_photo = f"{self.api_base}/sendPhoto"
+        self._url_edit_text = f"{self.api_base}/editMessageText"
+        self._url_edit_media = f"{self.api_base}/editMessageMedia"
+        self._url_answer_callback = f"{self.api_base}/answerCallbackQuery"
+        self._url_delete_message = f"{self.api_base}/deleteMessage"
+
+    def _post_with_retry(self, url: str, payload: Dict, max_retries: int = 3,
+                         base: float = 1.0, cap: float = 30.0):
+        """POST to Bot API, retrying transient failures with backoff + jitter
+
+        Retries connection errors, timeouts and 429/5xx responses. Client
+        errors like 400/401/403 are returned as-is - retrying can't fix them.
+        """
+        response = None
+        for attempt in range(max_retries + 1):
+            try:
+                response = self.session.post(url, content=_json_dumps(payload),
+                                             headers=_JSON_HEADERS)
+            except (httpx.TransportError, httpx.TimeoutException):
+                if attempt == max_retries:
+                    raise
+                response = None
+            else:
+                if response.status_code not in _RETRY_STATUS_CODES or attempt == max_retries:
+                    return response
+
+            # Exponential backoff with jitter, honoring Telegram's
+            # retry_after hint on rate limits
+            delay = min(cap, base * 2 ** attempt) * (1 + random.random() * 0.5)
+            if response is not None and response.status_code == 429:
+                try:
+                    delay = response.json()['parameters']['retry_after']
+                except Exception:
+                    pass
+            time.sleep(delay)
+
+        return response
 
     def send_message(self, chat_id: int, text: str, parse_mode: str = "HTML",
-                     reply_markup: Optional[Dict] = None) -> bool:
-        """Send text message to chat"""
-        url = f"{self.api_base}/sendMessage"
+                     reply_markup: Union[Dict, str, None] = None) -> Optional[int]:
+        """Send text message to chat, returning the new message ID"""
+        url = self._url_send_message
         payload = {
             "chat_id": chat_id,
             "text": text,
             "parse_mode": parse_mode
         }
         if reply_markup:
-            payload["reply_markup"] = json.dumps(reply_markup)
+            # Accept pre-serialized keyboards so static ones are encoded once
+            payload["reply_markup"] = reply_markup if isinstance(reply_markup, str) else _json_dumps(reply_markup).decode()
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._post_with_retry(url, payload)
             if response.status_code == 200:
                 # Get message_id from response to track it
                 result = response.json()
                 if result.get('ok') and 'result' in result:
-                    message_id = result['result'].get('message_id')
-                    if message_id:
-                        return message_id  # Return message_id instead of True
-                return True
-            return False
-        except Exception as e:
-            print(f"Error sending message: {e}")
-            return False
+                    return result['result'].get('message_id')
+            return None
+        except Exception:
+            logger.exception("Error sending message")
+            return None
 
     def send_message_clean(self, chat_id: int, text: str, parse_mode: str = "HTML",
-                          reply_markup: Optional[Dict] = None) -> bool:
+                          reply_markup: Union[Dict, str, None] = None) -> bool:
         """Send message and clean previous bot message"""
-        # Delete previous bot message
-        last_message_id = UserManager.get_last_bot_message_id(chat_id)
+        last_message_id, last_message_type = UserManager.get_last_bot_message(chat_id)
+
+        # Edit previous text message in place - one API call instead of
+        # delete + send
+        if last_message_id and last_message_type == 'text':
+            if self.edit_message_text(chat_id, last_message_id, text, parse_mode, reply_markup):
+                return True
+
+        # Fall back to delete + send (no previous message, type changed,
+        # or edit failed)
         if last_message_id:
             self.delete_message(chat_id, last_message_id)
 
         # Send new message
         new_message_id = self.send_message(chat_id, text, parse_mode, reply_markup)
+        if new_message_id is None:
+            return False
 
-        # Store new message ID if send was successful
-        if new_message_id and isinstance(new_message_id, int):
-            UserManager.set_last_bot_message_id(chat_id, new_message_id)
-            return True
-        elif new_message_id:  # If it returned True (old behavior)
-            return True
-
-        return False
+        UserManager.set_last_bot_message_id(chat_id, new_message_id, 'text')
+        return True
 
     def send_photo(self, chat_id: int, photo: str, caption: str = "",
-                   reply_markup: Optional[Dict] = None) -> bool:
-        """Send photo to chat"""
-        url = f"{self.api_base}/sendPhoto"
+                   reply_markup: Union[Dict, str, None] = None) -> Optional[int]:
+        """Send photo to chat, returning the new message ID"""
+        url = self._url_send_photo
         payload = {
             "chat_id": chat_id,
             "photo": photo,
             "caption": caption
         }
         if reply_markup:
-            payload["reply_markup"] = json.dumps(reply_markup)
+            # Accept pre-serialized keyboards so static ones are encoded once
+            payload["reply_markup"] = reply_markup if isinstance(reply_markup, str) else _json_dumps(reply_markup).decode()
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._post_with_retry(url, payload)
             if response.status_code == 200:
                 # Get message_id from response to track it
                 result = response.json()
                 if result.get('ok') and 'result' in result:
-                    message_id = result['result'].get('message_id')
-                    if message_id:
-                        return message_id  # Return message_id instead of True
-                return True
-            return False
-        except Exception as e:
-            print(f"Error sending photo: {e}")
-            return False
+                    return result['result'].get('message_id')
+            return None
+        except Exception:
+            logger.exception("Error sending photo")
+            return None
 
     def send_photo_clean(self, chat_id: int, photo: str, caption: str = "",
-                        reply_markup: Optional[Dict] = None) -> bool:
+                        reply_markup: Union[Dict, str, None] = None) -> bool:
         """Send photo and clean previous bot message"""
-        # Delete previous bot message
-        last_message_id = UserManager.get_last_bot_message_id(chat_id)
+        last_message_id, last_message_type = UserManager.get_last_bot_message(chat_id)
+
+        # Edit previous photo message in place - one API call instead of
+        # delete + send
+        if last_message_id and last_message_type == 'photo':
+            if self.edit_message_media(chat_id, last_message_id, photo, caption, reply_markup):
+                return True
+
+        # Fall back to delete + send (no previous message, type changed,
+        # or edit failed)
         if last_message_id:
             self.delete_message(chat_id, last_message_id)
 
         # Send new photo
         new_message_id = self.send_photo(chat_id, photo, caption, reply_markup)
+        if new_message_id is None:
+            return False
 
-        # Store new message ID if send was successful
-        if new_message_id and isinstance(new_message_id, int):
-            UserManager.set_last_bot_message_id(chat_id, new_message_id)
-            return True
-        elif new_message_id:  # If it returned True (old behavior)
-            return True
-
-        return False
+        UserManager.set_last_bot_message_id(chat_id, new_message_id, 'photo')
+        return True
 
     def edit_message_text(self, chat_id: int, message_id: int, text: str,
-                          parse_mode: str = "HTML", reply_markup: Optional[Dict] = None) -> bool:
+                          parse_mode: str = "HTML", reply_markup: Union[Dict, str, None] = None) -> bool:
         """Edit existing message text"""
-        url = f"{self.api_base}/editMessageText"
+        url = self._url_edit_text
         payload = {
             "chat_id": chat_id,
             "message_id": message_id,
@@ -123,19 +213,40 @@ class TelegramBot:
             "parse_mode": parse_mode
         }
         if reply_markup:
-            payload["reply_markup"] = json.dumps(reply_markup)
+            # Accept pre-serialized keyboards so static ones are encoded once
+            payload["reply_markup"] = reply_markup if isinstance(reply_markup, str) else _json_dumps(reply_markup).decode()
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._post_with_retry(url, payload)
             return response.status_code == 200
-        except Exception as e:
-            print(f"Error editing message: {e}")
+        except Exception:
+            logger.exception("Error editing message")
+            return False
+
+    def edit_message_media(self, chat_id: int, message_id: int, photo: str,
+                           caption: str = "", reply_markup: Union[Dict, str, None] = None) -> bool:
+        """Edit existing message media (photo)"""
+        url = self._url_edit_media
+        payload = {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "media": _json_dumps({"type": "photo", "media": photo, "caption": caption}).decode()
+        }
+        if reply_markup:
+            # Accept pre-serialized keyboards so static ones are encoded once
+            payload["reply_markup"] = reply_markup if isinstance(reply_markup, str) else _json_dumps(reply_markup).decode()
+
+        try:
+            response = self._post_with_retry(url, payload)
+            return response.status_code == 200
+        except Exception:
+            logger.exception("Error editing message media")
             return False
 
     def answer_callback_query(self, callback_query_id: str, text: str = "",
                               show_alert: bool = False) -> bool:
         """Answer callback query"""
-        url = f"{self.api_base}/answerCallbackQuery"
+        url = self._url_answer_callback
         payload = {
             "callback_query_id": callback_query_id,
             "text": text,
@@ -143,25 +254,25 @@ class TelegramBot:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._post_with_retry(url, payload)
             return response.status_code == 200
-        except Exception as e:
-            print(f"Error answering callback query: {e}")
+        except Exception:
+            logger.exception("Error answering callback query")
             return False
 
     def delete_message(self, chat_id: int, message_id: int) -> bool:
         """Delete a message"""
-        url = f"{self.api_base}/deleteMessage"
+        url = self._url_delete_message
         payload = {
             "chat_id": chat_id,
             "message_id": message_id
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._post_with_retry(url, payload)
             return response.status_code == 200
-        except Exception as e:
-            print(f"Error deleting message: {e}")
+        except Exception:
+            logger.exception("Error deleting message")
             return False
 
 
@@ -189,29 +300,30 @@ class BotMessageHandler:
             else:
                 return self.handle_unknown_message(message)
 
-        except Exception as e:
-            print(f"Error handling update: {e}")
+        except Exception:
+            logger.exception("Error handling update")
             return False
 
     def handle_text_message(self, message: Message) -> bool:
         """Handle text messages and commands"""
+        # Normalize once - handlers get the stripped and lowercased forms
+        # instead of re-scanning the string
         text = message.text.strip()
+        text_lower = text.lower()
 
         # Handle commands
         if text.startswith('/'):
-            return self.handle_command(message, text)
+            return self.handle_command(message, text, text_lower)
 
         # Handle regular text
-        return self.handle_regular_text(message, text)
+        return self.handle_regular_text(message, text, text_lower)
 
-    def handle_command(self, message: Message, command: str) -> bool:
+    def handle_command(self, message: Message, command: str, command_lower: str) -> bool:
         """Handle bot commands"""
-        command_lower = command.lower()
-
-        if command_lower in ['/start', '/help']:
-            return self.handle_start_command(message)
-        else:
-            return self.handle_unknown_command(message, command)
+        handler = self._COMMAND_ROUTES.get(command_lower)
+        if handler:
+            return handler(self, message)
+        return self.handle_unknown_command(message, command)
 
     def handle_start_command(self, message: Message) -> bool:
         """Handle /start command"""
@@ -220,7 +332,7 @@ class BotMessageHandler:
         # Always check if user exists in Redis, create if not
         user = UserManager.get_user(message.user_id)
         if not user:
-            print(f"Creating new user from bot /start: {message.user_id}")
+            logger.info("Creating new user from bot /start: %s", message.user_id)
             user = UserManager.create_user(
                 telegram_id=message.user_id,
                 first_name=message.first_name or '',
@@ -229,27 +341,15 @@ class BotMessageHandler:
                 language_code='en'  # Default, could be extracted from update
             )
         else:
-            print(f"Existing user started bot: {message.user_id}")
+            logger.debug("Existing user started bot: %s", message.user_id)
 
         # Clear any previous bot message tracking when user restarts
         UserManager.clear_last_bot_message_id(message.user_id)
 
-        welcome_text = f"""
-👋 Hello, <b>{user_name}</b>!
+        welcome_text = _WELCOME_TEMPLATE.format(name=user_name)
 
-Welcome to our Telegram App Template!
-
-        """.strip()
-
-        # Create inline keyboard with web app button
-        keyboard = {
-            "inline_keyboard": [
-                [{"text": "🚀 Open Web App", "web_app": {"url": FRONT_URL}}],
-                [{"text": "👨‍💻 About me", "url": SHUMILOV_WEBSITE}]
-            ]
-        }
-
-        return self.bot.send_message_clean(message.chat_id, welcome_text, reply_markup=keyboard)
+        return self.bot.send_message_clean(message.chat_id, welcome_text,
+                                           reply_markup=_START_KEYBOARD_JSON)
 
 
     def handle_unknown_command(self, message: Message, command: str) -> bool:
@@ -264,38 +364,32 @@ Available commands:
 
         return self.bot.send_message_clean(message.chat_id, text)
 
-    def handle_regular_text(self, message: Message, text: str) -> bool:
-        """Handle regular text messages"""
-        text_lower = text.lower().strip()
+    def _reply_hello(self, message: Message) -> bool:
+        """Greet the user"""
+        response = f"Hello {message.get_full_name()}! 👋\n\nUse /start to see available options."
+        return self.bot.send_message_clean(message.chat_id, response)
 
+    def _reply_thanks(self, message: Message) -> bool:
+        """Acknowledge thanks"""
+        return self.bot.send_message_clean(message.chat_id, "You're welcome! 😊")
+
+    def handle_regular_text(self, message: Message, text: str, text_lower: str) -> bool:
+        """Handle regular text messages"""
         # IMPORTANT: Never delete /start command!
         if text_lower == '/start':
-            print(f"Received /start command from user {message.user_id} - NOT deleting")
+            logger.debug("Received /start command from user %s - NOT deleting", message.user_id)
             # Don't delete /start, let it be handled by command handler
             return True
 
-        # Simple if/elif/else dialog script
-        if text_lower in ['hi', 'hello', 'hey', 'привет']:
-            response = f"Hello {message.get_full_name()}! 👋\n\nUse /start to see available options."
-            return self.bot.send_message_clean(message.chat_id, response)
+        # Dialog script lookup - add new keywords to _TEXT_ROUTES below
+        handler = self._TEXT_ROUTES.get(text_lower)
+        if handler:
+            return handler(self, message)
 
-        elif text_lower in ['help', 'помощь']:
-            return self.handle_start_command(message)
-
-        elif text_lower in ['thanks', 'thank you', 'спасибо']:
-            response = "You're welcome! 😊"
-            return self.bot.send_message_clean(message.chat_id, response)
-
-        # Add more elif conditions here for your specific dialog script
-        # elif text_lower == 'some_keyword':
-        #     response = "Your response here"
-        #     return self.bot.send_message(message.chat_id, response)
-
-        else:
-            # Message doesn't match any dialog script - delete it
-            print(f"Deleting unhandled message from user {message.user_id}: '{text}'")
-            self.bot.delete_message(message.chat_id, message.message_id)
-            return True
+        # Message doesn't match any dialog script - delete it
+        logger.debug("Deleting unhandled message from user %s: %r", message.user_id, text)
+        self.bot.delete_message(message.chat_id, message.message_id)
+        return True
 
     # def handle_callback_query(self, message: Message, callback_query: Dict) -> bool:
     #     """Handle callback button presses"""
@@ -327,42 +421,36 @@ Available commands:
 
     def handle_media_message(self, message: Message) -> bool:
         """Handle media messages (photos, videos, etc.)"""
-        # Simple media handling - you can add specific logic here if needed
-
-        if message.photo:
-            # Handle photo - you can add specific photo logic here
-            # For now, just delete unhandled photos
-            print(f"Deleting unhandled photo from user {message.user_id}")
-            self.bot.delete_message(message.chat_id, message.message_id)
-            return True
-
-        elif message.video:
-            # Handle video - you can add specific video logic here
-            print(f"Deleting unhandled video from user {message.user_id}")
-            self.bot.delete_message(message.chat_id, message.message_id)
-            return True
-
-        elif message.voice:
-            # Handle voice - you can add specific voice logic here
-            print(f"Deleting unhandled voice from user {message.user_id}")
-            self.bot.delete_message(message.chat_id, message.message_id)
-            return True
-
-        elif message.document:
-            # Handle document - you can add specific document logic here
-            print(f"Deleting unhandled document from user {message.user_id}")
-            self.bot.delete_message(message.chat_id, message.message_id)
-            return True
-
-        else:
-            # Unknown media type
-            print(f"Deleting unknown media from user {message.user_id}")
-            self.bot.delete_message(message.chat_id, message.message_id)
-            return True
+        # All media kinds are unhandled for now and get the same treatment -
+        # add a branch on `kind` here for media-specific logic
+        kind = next((k for k in ('photo', 'video', 'voice', 'document')
+                     if getattr(message, k)), 'unknown media')
+        logger.debug("Deleting unhandled %s from user %s", kind, message.user_id)
+        self.bot.delete_message(message.chat_id, message.message_id)
+        return True
 
     def handle_unknown_message(self, message: Message) -> bool:
         """Handle unknown message types"""
         # Delete unknown message types as well
-        print(f"Deleting unknown message type from user {message.user_id}")
+        logger.debug("Deleting unknown message type from user %s", message.user_id)
         self.bot.delete_message(message.chat_id, message.message_id)
-        return True
\ No newline at end of file
+        return True
+
+    # Dispatch tables - O(1) dict lookup instead of if/elif list scans.
+    # Add new commands and dialog keywords here, mapped to handler methods.
+    _COMMAND_ROUTES = {
+        '/start': handle_start_command,
+        '/help': handle_start_command,
+    }
+
+    _TEXT_ROUTES = {
+        'hi': _reply_hello,
+        'hello': _reply_hello,
+        'hey': _reply_hello,
+        'привет': _reply_hello,
+        'help': handle_start_command,
+        'помощь': handle_start_command,
+        'thanks': _reply_thanks,
+        'thank you': _reply_thanks,
+        'спасибо': _reply_thanks,
+    }
\ No newline at end of file
@@ -5,6 +5,8 @@ NO DEFAULT VALUES - All values must be explicitly configured
 
 import os
 import sys
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -39,65 +41,145 @@ def validate_project_name(project_name: str) -> str:
         sys.exit(1)
     return project_name.lower()
 
-# Core Configuration (REQUIRED)
-PROJECT_NAME = validate_project_name(get_required_env('PROJECT_NAME'))
-SECRET_KEY = get_required_env('SECRET_KEY')
-BOT_TOKEN = get_required_env('BOT_TOKEN')
-
-# Flask Configuration
-FLASK_HOST = '0.0.0.0'  # Hardcoded - no need to configure
-FLASK_PORT = get_required_env_int('FLASK_PORT')
-FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
-
-# URL Configuration (REQUIRED)
-FRONT_URL = get_required_env('FRONTEND_URL')
-BACKEND_URL = get_required_env('BACKEND_URL')
-
-# Auto-generated Docker Configuration
-FLASK_CONTAINER_NAME = f"{PROJECT_NAME}-flask"
-REDIS_CONTAINER_NAME = f"{PROJECT_NAME}-redis"
-PRIVATE_NETWORK_NAME = f"{PROJECT_NAME}-private-network"
-PUBLIC_NETWORK_NAME = f"{PROJECT_NAME}-public-network"
-REDIS_VOLUME_NAME = f"{PROJECT_NAME}-redis-data"
-
-# Auto-generated URLs and Ports
-WEBHOOK_URL = f"{BACKEND_URL}/api/webhook"
-REDIS_PORT = 6379  # Hardcoded - isolated in container, no conflicts possible
-REDIS_URL = f"redis://{REDIS_CONTAINER_NAME}:{REDIS_PORT}/0"
-
-# Optional Configuration
-SHUMILOV_WEBSITE = os.getenv('SHUMILOV_WEBSITE', 'https://sh-development.ru')
-
-# Development User Bypass Configuration (OPTIONAL)
-ENABLE_DEV_USER = os.getenv('ENABLE_DEV_USER', 'false').lower() == 'true'
-DEV_USER_ID = int(os.getenv('DEV_USER_ID', '999999999'))
-DEV_USER_FIRST_NAME = os.getenv('DEV_USER_FIRST_NAME', 'Dev User')
-DEV_USER_LAST_NAME = os.getenv('DEV_USER_LAST_NAME', 'Template')
-DEV_USER_USERNAME = os.getenv('DEV_USER_USERNAME', 'dev_user')
-DEV_USER_LANGUAGE = os.getenv('DEV_USER_LANGUAGE', 'en')
-DEV_AUTH_HEADER = os.getenv('DEV_AUTH_HEADER', 'dev-user-bypass')
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Immutable application settings, built from the environment in one pass"""
+    project_name: str
+    secret_key: str
+    bot_token: str
+    flask_host: str
+    flask_port: int
+    flask_debug: bool
+    front_url: str
+    backend_url: str
+    flask_container_name: str
+    redis_container_name: str
+    private_network_name: str
+    public_network_name: str
+    redis_volume_name: str
+    webhook_url: str
+    redis_port: int
+    redis_url: str
+    shumilov_website: str
+    enable_dev_user: bool
+    dev_user_id: int
+    dev_user_first_name: str
+    dev_user_last_name: str
+    dev_user_username: str
+    dev_user_language: str
+    dev_auth_header: str
+    telegram_api_base: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Read and validate the environment once, returning cached Settings"""
+    project_name = validate_project_name(get_required_env('PROJECT_NAME'))
+    bot_token = get_required_env('BOT_TOKEN')
+    backend_url = get_required_env('BACKEND_URL')
+
+    # Auto-generated Docker configuration
+    redis_container_name = f"{project_name}-redis"
+    redis_port = 6379  # Hardcoded - isolated in container, no conflicts possible
+
+    return Settings(
+        # Core Configuration (REQUIRED)
+        project_name=project_name,
+        secret_key=get_required_env('SECRET_KEY'),
+        bot_token=bot_token,
+
+        # Flask Configuration
+        flask_host='0.0.0.0',  # Hardcoded - no need to configure
+        flask_port=get_required_env_int('FLASK_PORT'),
+        flask_debug=os.getenv('FLASK_DEBUG', 'False').lower() == 'true',
+
+        # URL Configuration (REQUIRED)
+        front_url=get_required_env('FRONTEND_URL'),
+        backend_url=backend_url,
+
+        # Auto-generated Docker Configuration
+        flask_container_name=f"{project_name}-flask",
+        redis_container_name=redis_container_name,
+        private_network_name=f"{project_name}-private-network",
+        public_network_name=f"{project_name}-public-network",
+        redis_volume_name=f"{project_name}-redis-data",
+
+        # Auto-generated URLs and Ports
+        webhook_url=f"{backend_url}/api/webhook",
+        redis_port=redis_port,
+        redis_url=f"redis://{redis_container_name}:{redis_port}/0",
+
+        # Optional Configuration
+        shumilov_website=os.getenv('SHUMILOV_WEBSITE', 'https://sh-development.ru'),
+
+        # Development User Bypass Configuration (OPTIONAL)
+        enable_dev_user=os.getenv('ENABLE_DEV_USER', 'false').lower() == 'true',
+        dev_user_id=int(os.getenv('DEV_USER_ID', '999999999')),
+        dev_user_first_name=os.getenv('DEV_USER_FIRST_NAME', 'Dev User'),
+        dev_user_last_name=os.getenv('DEV_USER_LAST_NAME', 'Template'),
+        dev_user_username=os.getenv('DEV_USER_USERNAME', 'dev_user'),
+        dev_user_language=os.getenv('DEV_USER_LANGUAGE', 'en'),
+        dev_auth_header=os.getenv('DEV_AUTH_HEADER', 'dev-user-bypass'),
+
+        # Telegram API Base URL
+        telegram_api_base=f"https://api.telegram.org/bot{bot_token}",
+    )
+
+
+_settings = get_settings()
+
+# Module-level aliases for existing imports - new hot-path code should
+# prefer get_settings()
+PROJECT_NAME = _settings.project_name
+SECRET_KEY = _settings.secret_key
+BOT_TOKEN = _settings.bot_token
+FLASK_HOST = _settings.flask_host
+FLASK_PORT = _settings.flask_port
+FLASK_DEBUG = _settings.flask_debug
+FRONT_URL = _settings.front_url
+BACKEND_URL = _settings.backend_url
+FLASK_CONTAINER_NAME = _settings.flask_container_name
+REDIS_CONTAINER_NAME = _settings.redis_container_name
+PRIVATE_NETWORK_NAME = _settings.private_network_name
+PUBLIC_NETWORK_NAME = _settings.public_network_name
+REDIS_VOLUME_NAME = _settings.redis_volume_name
+WEBHOOK_URL = _settings.webhook_url
+REDIS_PORT = _settings.redis_port
+REDIS_URL = _settings.redis_url
+SHUMILOV_WEBSITE = _settings.shumilov_website
+ENABLE_DEV_USER = _settings.enable_dev_user
+DEV_USER_ID = _settings.dev_user_id
+DEV_USER_FIRST_NAME = _settings.dev_user_first_name
+DEV_USER_LAST_NAME = _settings.dev_user_last_name
+DEV_USER_USERNAME = _settings.dev_user_username
+DEV_USER_LANGUAGE = _settings.dev_user_language
+DEV_AUTH_HEADER = _settings.dev_auth_header
+TELEGRAM_API_BASE = _settings.telegram_api_base
 
 # CORS Configuration Removed - Telegram cryptographic validation provides security
 
-# Telegram API Base URL
-TELEGRAM_API_BASE = f"https://api.telegram.org/bot{BOT_TOKEN}"
-
-print("✅ All environment variables validated successfully!")
-print(f"   Project: {PROJECT_NAME}")
-print(f"   Flask container: {FLASK_CONTAINER_NAME} (exposed port: {FLASK_PORT})")
-print(f"   Redis container: {REDIS_CONTAINER_NAME} (internal port: {REDIS_PORT})")
-print(f"   Private network: {PRIVATE_NETWORK_NAME}")
-print(f"   Public network: {PUBLIC_NETWORK_NAME}")
-print(f"   Volume: {REDIS_VOLUME_NAME}")
-print(f"   Frontend URL: {FRONT_URL}")
-print(f"   Backend URL: {BACKEND_URL}")
-print(f"   Webhook URL: {WEBHOOK_URL}")
-print("🔓 CORS disabled - All origins allowed (Telegram validation provides security)")
-
-if ENABLE_DEV_USER:
-    print("🚧 DEV USER BYPASS ENABLED - Local development mode")
-    print(f"   Dev user ID: {DEV_USER_ID}")
-    print(f"   Dev auth header: X-Dev-Auth: {DEV_AUTH_HEADER}")
-    print("   ⚠️  WARNING: Only use for development/testing!")
-else:
-    print("🔒 Production mode - Telegram authentication required")
\ No newline at end of file
+# Startup banner - set CONSTANTS_QUIET=1 to silence it; the Dockerfile
+# sets it so gunicorn workers don't each reprint the banner
+_QUIET = os.getenv('CONSTANTS_QUIET', '0') == '1'
+
+if not _QUIET:
+    print("✅ All environment variables validated successfully!")
+    print(f"   Project: {PROJECT_NAME}")
+    print(f"   Flask container: {FLASK_CONTAINER_NAME} (exposed port: {FLASK_PORT})")
+    print(f"   Redis container: {REDIS_CONTAINER_NAME} (internal port: {REDIS_PORT})")
+    print(f"   Private network: {PRIVATE_NETWORK_NAME}")
+    print(f"   Public network: {PUBLIC_NETWORK_NAME}")
+    print(f"   Volume: {REDIS_VOLUME_NAME}")
+    print(f"   Frontend URL: {FRONT_URL}")
+    print(f"   Backend URL: {BACKEND_URL}")
+    print(f"   Webhook URL: {WEBHOOK_URL}")
+    print("🔓 CORS disabled - All origins allowed (Telegram validation provides security)")
+
+    if ENABLE_DEV_USER:
+        print("🚧 DEV USER BYPASS ENABLED - Local development mode")
+        print(f"   Dev user ID: {DEV_USER_ID}")
+        print(f"   Dev auth header: X-Dev-Auth: {DEV_AUTH_HEADER}")
+        print("   ⚠️  WARNING: Only use for development/testing!")
+    else:
+        print("🔒 Production mode - Telegram authentication required")
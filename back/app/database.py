@@ -4,13 +4,31 @@ Redis database connection and utilities
 
 import redis
 import json
+import logging
 import time
-from datetime import datetime
 from urllib.parse import urlparse
 
+# user_data stays JSON text rather than a binary format like MessagePack:
+# the shared client runs decode_responses=True, so binary values would need
+# a second binary-mode pool (or base64 wrapping) for one hash field
+try:
+    import orjson
 
-# Global Redis connection
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+    _json_loads = orjson.loads
+except ImportError:
+    # Fall back to stdlib json when orjson isn't installed
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj)
+    _json_loads = json.loads
+
+
+logger = logging.getLogger(__name__)
+
+# Global Redis connection - one pool shared by every UserManager call
 redis_client = None
+redis_pool = None
 
 
 def wait_for_redis(redis_url, max_retries=30, retry_delay=2):
@@ -48,7 +66,7 @@ def wait_for_redis(redis_url, max_retries=30, retry_delay=2):
 
 def init_redis(app):
     """Initialize Redis connection"""
-    global redis_client
+    global redis_client, redis_pool
 
     redis_url = app.config['REDIS_URL']
     parsed_url = urlparse(redis_url)
@@ -57,14 +75,23 @@ def init_redis(app):
     port = parsed_url.port or 6379
     db = int(parsed_url.path.lstrip('/')) if parsed_url.path else 0
 
-    redis_client = redis.Redis(
+    # The pool (and its sockets) is the expensive part - create it once
+    # at startup and hand it to a single shared client. The blocking pool
+    # is bounded: under load threads wait briefly for a free connection
+    # instead of raising ConnectionError, and TCP keepalive stops idle
+    # sockets from being dropped silently
+    redis_pool = redis.BlockingConnectionPool(
         host=host,
         port=port,
         db=db,
         decode_responses=True,
+        max_connections=64,
+        timeout=2,
         socket_connect_timeout=10,
-        socket_timeout=10
+        socket_timeout=10,
+        socket_keepalive=True
     )
+    redis_client = redis.Redis(connection_pool=redis_pool)
 
     try:
         redis_client.ping()
@@ -102,7 +129,7 @@ class UserManager:
 
         # Convert stored JSON strings back to objects
         if 'user_data' in user_data:
-            user_data['user_data'] = json.loads(user_data['user_data'])
+            user_data['user_data'] = _json_loads(user_data['user_data'])
 
         return user_data
 
@@ -116,26 +143,33 @@ class UserManager:
         if redis_conn.exists(user_key):
             return UserManager.get_user(telegram_id)
 
-        now = datetime.utcnow().isoformat()
+        # Unix timestamps are cheaper to produce and store than ISO strings;
+        # kept as str so the returned record matches what hgetall gives back
+        now = str(int(time.time()))
         user_data = {
             'telegram_id': str(telegram_id),
             'first_name': first_name or '',
             'last_name': last_name or '',
             'username': username or '',
             'language_code': language_code or '',
-            'user_data': json.dumps({}),  # Store as JSON string
+            'user_data': _json_dumps({}),  # Store as JSON string
             'created_at': now,
             'updated_at': now
         }
 
-        # Store user data
-        redis_conn.hset(user_key, mapping=user_data)
+        # Ship both writes in a single round-trip: store user data, add to
+        # user index for admin purposes
+        with redis_conn.pipeline(transaction=False) as pipe:
+            pipe.hset(user_key, mapping=user_data)
+            pipe.sadd('users:index', telegram_id)
+            pipe.execute()
 
-        # Add to user index for admin purposes
-        redis_conn.sadd('users:index', telegram_id)
+        # The full record is already in hand - return it instead of
+        # reading it back with an extra HGETALL
+        user_data['user_data'] = {}
 
-        print(f"Created new user: {telegram_id}")
-        return UserManager.get_user(telegram_id)
+        logger.info("Created new user: %s", telegram_id)
+        return user_data
 
     @staticmethod
     def update_user(telegram_id, updates):
@@ -152,17 +186,23 @@ class UserManager:
         for key, value in updates.items():
             if key == 'user_data':
                 # Store user_data as JSON string
-                update_data[key] = json.dumps(value)
+                update_data[key] = _json_dumps(value)
             else:
                 update_data[key] = str(value)
 
-        update_data['updated_at'] = datetime.utcnow().isoformat()
+        update_data['updated_at'] = str(int(time.time()))
+
+        # Update user data and read the merged record back in one round-trip
+        with redis_conn.pipeline(transaction=False) as pipe:
+            pipe.hset(user_key, mapping=update_data)
+            pipe.hgetall(user_key)
+            _, updated = pipe.execute()
 
-        # Update user data
-        redis_conn.hset(user_key, mapping=update_data)
+        if 'user_data' in updated:
+            updated['user_data'] = _json_loads(updated['user_data'])
 
-        print(f"Updated user: {telegram_id}")
-        return UserManager.get_user(telegram_id)
+        logger.info("Updated user: %s", telegram_id)
+        return updated
 
     @staticmethod
     def delete_user(telegram_id):
@@ -176,7 +216,7 @@ class UserManager:
         # Delete user data
         deleted = redis_conn.delete(user_key)
 
-        print(f"Deleted user: {telegram_id}")
+        logger.info("Deleted user: %s", telegram_id)
         return deleted > 0
 
     @staticmethod
@@ -185,6 +225,32 @@ class UserManager:
         redis_conn = get_redis()
         return redis_conn.smembers('users:index')
 
+    @staticmethod
+    def get_all_users_bulk():
+        """Get all user records in one round-trip (admin function)
+
+        Pipelines every HGETALL instead of one round-trip per user.
+        """
+        redis_conn = get_redis()
+        user_ids = list(redis_conn.smembers('users:index'))
+        if not user_ids:
+            return []
+
+        with redis_conn.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.hgetall(UserManager._get_user_key(user_id))
+            results = pipe.execute()
+
+        users = []
+        for user_data in results:
+            if not user_data:
+                continue
+            if 'user_data' in user_data:
+                user_data['user_data'] = _json_loads(user_data['user_data'])
+            users.append(user_data)
+
+        return users
+
     @staticmethod
     def user_exists(telegram_id):
         """Check if user exists"""
@@ -193,22 +259,36 @@ class UserManager:
         return redis_conn.exists(user_key)
 
     @staticmethod
-    def set_last_bot_message_id(telegram_id, message_id: int):
-        """Store the ID of the last message bot sent to user"""
+    def set_last_bot_message_id(telegram_id, message_id: int, message_type: str = 'text'):
+        """Store the ID and type of the last message bot sent to user"""
         redis_conn = get_redis()
         key = f"last_bot_msg:{telegram_id}"
-        redis_conn.set(key, str(message_id))
-        # Set expiry for message ID (7 days)
-        redis_conn.expire(key, 604800)
+        # Single atomic SET with 7-day expiry
+        redis_conn.set(key, _json_dumps({'id': message_id, 'type': message_type}), ex=604800)
         return True
 
     @staticmethod
-    def get_last_bot_message_id(telegram_id):
-        """Get the ID of the last message bot sent to user"""
+    def get_last_bot_message(telegram_id):
+        """Get the ID and type of the last message bot sent to user"""
         redis_conn = get_redis()
         key = f"last_bot_msg:{telegram_id}"
-        message_id = redis_conn.get(key)
-        return int(message_id) if message_id else None
+        stored = redis_conn.get(key)
+        if not stored:
+            return None, None
+
+        try:
+            data = _json_loads(stored)
+            if isinstance(data, dict):
+                return data.get('id'), data.get('type', 'text')
+            # Legacy format: bare message ID (decodes as a plain int)
+            return int(data), 'text'
+        except (ValueError, TypeError):
+            return None, None
+
+    @staticmethod
+    def get_last_bot_message_id(telegram_id):
+        """Get the ID of the last message bot sent to user"""
+        return UserManager.get_last_bot_message(telegram_id)[0]
 
     @staticmethod
     def clear_last_bot_message_id(telegram_id):
@@ -2,7 +2,23 @@
 API routes for user management
 """
 
-from flask import Blueprint, request, jsonify, current_app
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, Response, request
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    # Fall back to stdlib json when orjson isn't installed
+    import json
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
 from .database import UserManager, check_redis_health
 from .telegram_utils import validate_request_auth, TelegramValidator, validate_telegram_webhook
 from .bot_logic import TelegramBot, BotMessageHandler
@@ -13,18 +29,43 @@ from .constants import (
 )
 
 
+logger = logging.getLogger(__name__)
+
 api_bp = Blueprint('api', __name__)
 
 
+def _json(obj, status=200):
+    """Build a JSON response with orjson instead of Flask's encoder"""
+    return Response(_json_dumps(obj), status=status, mimetype='application/json')
+
+
+# Shared bot instance - reuses one connection pool across all webhook
+# updates instead of rebuilding the client per request
+bot = TelegramBot(BOT_TOKEN)
+bot_handler = BotMessageHandler(bot)
+
+# Background pool for webhook updates - Telegram gets its 200 immediately
+# instead of waiting for the Bot API round-trips. The semaphore bounds
+# in-flight plus queued updates so an update flood sheds load instead of
+# growing the executor's (otherwise unbounded) work queue
+webhook_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='webhook')
+_webhook_slots = threading.BoundedSemaphore(64)
+
+
+def _handle_update_and_release(update):
+    try:
+        bot_handler.handle_update(update)
+    finally:
+        _webhook_slots.release()
+
+
 @api_bp.route('/user/get_data', methods=['OPTIONS'])
 @api_bp.route('/user/up_data', methods=['OPTIONS'])
 def user_options():
     """Handle OPTIONS preflight for user endpoints"""
-    print("DEBUG: OPTIONS request to /user endpoint")
-    print(f"DEBUG: Origin: {request.headers.get('Origin')}")
-    print(f"DEBUG: Access-Control-Request-Headers: {request.headers.get('Access-Control-Request-Headers')}")
+    logger.debug("OPTIONS request to /user endpoint (origin: %s)",
+                 request.headers.get('Origin'))
 
-    from flask import Response
     response = Response()
     response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin')
     response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
@@ -37,36 +78,22 @@ def user_options():
 def get_user_data():
     """Get or create user data"""
     try:
-        # Debug: Log request headers
-        print(f"DEBUG: Request headers: {dict(request.headers)}")
-        print(f"DEBUG: X-Telegram-Init-Data present: {'X-Telegram-Init-Data' in request.headers}")
-
-        # Check bot token configuration
-        if not current_app.config.get('BOT_TOKEN'):
-            return jsonify({
-                'error': 'Bot token not configured',
-                'message': 'Please set BOT_TOKEN environment variable'
-            }), 500
-
-        # Validate authentication
-        is_valid, user_data, error_msg = validate_request_auth(
-            request, current_app.config['BOT_TOKEN']
-        )
+        # Validate authentication - BOT_TOKEN is validated at import time,
+        # no per-request config lookup needed
+        is_valid, user_data, error_msg = validate_request_auth(request, BOT_TOKEN)
 
-        # After authentication validation
-        print(f"DEBUG: Auth validation result: is_valid={is_valid}, error_msg={error_msg}")
+        logger.debug("Auth validation result: is_valid=%s, error_msg=%s", is_valid, error_msg)
 
         if not is_valid:
-            return jsonify({'error': error_msg}), 401
+            return _json({'error': error_msg}, 401)
 
         telegram_id = user_data['id']
 
         # Check if user exists
         existing_user = UserManager.get_user(telegram_id)
         if existing_user:
-            # When returning user data
-            print(f"DEBUG: Returning existing user: {existing_user}")
-            return jsonify({'user': existing_user})
+            logger.debug("Returning existing user: %s", existing_user)
+            return _json({'user': existing_user})
 
         # Create new user
         sanitized_user_data = TelegramValidator.sanitize_user_data(user_data)
@@ -78,12 +105,12 @@ def get_user_data():
             language_code=sanitized_user_data.get('language_code', '')
         )
 
-        print(f"DEBUG: Created new user: {new_user}")
-        return jsonify({'user': new_user})
+        logger.debug("Created new user: %s", new_user)
+        return _json({'user': new_user})
 
-    except Exception as e:
-        print(f"Error in get_user: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+    except Exception:
+        logger.exception("Error in get_user")
+        return _json({'error': 'Internal server error'}, 500)
 
 
 @api_bp.route('/user/up_data', methods=['POST'])
@@ -93,44 +120,35 @@ def update_user_data():
         # Get request data
         update_data = request.get_json()
         if not update_data:
-            return jsonify({'error': 'No data provided'}), 400
+            return _json({'error': 'No data provided'}, 400)
 
         # Validate update data
         is_valid, validation_msg = TelegramValidator.validate_user_update_data(update_data)
         if not is_valid:
-            return jsonify({'error': validation_msg}), 400
-
-        # Check bot token configuration
-        if not current_app.config.get('BOT_TOKEN'):
-            return jsonify({
-                'error': 'Bot token not configured',
-                'message': 'Please set BOT_TOKEN environment variable'
-            }), 500
+            return _json({'error': validation_msg}, 400)
 
         # Validate authentication
-        is_valid, user_data, error_msg = validate_request_auth(
-            request, current_app.config['BOT_TOKEN']
-        )
+        is_valid, user_data, error_msg = validate_request_auth(request, BOT_TOKEN)
 
         if not is_valid:
-            return jsonify({'error': error_msg}), 401
+            return _json({'error': error_msg}, 401)
 
         telegram_id = user_data['id']
 
         # Check if user exists
         if not UserManager.user_exists(telegram_id):
-            return jsonify({'error': 'User not found'}), 404
+            return _json({'error': 'User not found'}, 404)
 
         # Update user
         updated_user = UserManager.update_user(telegram_id, update_data)
         if not updated_user:
-            return jsonify({'error': 'Failed to update user'}), 500
+            return _json({'error': 'Failed to update user'}, 500)
 
-        return jsonify({'user': updated_user})
+        return _json({'user': updated_user})
 
-    except Exception as e:
-        print(f"Error in update_user: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+    except Exception:
+        logger.exception("Error in update_user")
+        return _json({'error': 'Internal server error'}, 500)
 
 
 
@@ -139,16 +157,16 @@ def api_health():
     """API health check"""
     try:
         redis_healthy = check_redis_health()
-        return jsonify({
+        return _json({
             'status': 'healthy' if redis_healthy else 'unhealthy',
             'redis': 'connected' if redis_healthy else 'disconnected',
             'timestamp': request.headers.get('X-Request-Time')
         })
     except Exception as e:
-        return jsonify({
+        return _json({
             'status': 'unhealthy',
             'error': str(e)
-        }), 500
+        }, 500)
 
 
 
@@ -156,17 +174,17 @@ def api_health():
 # Error handlers
 @api_bp.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return _json({'error': 'Endpoint not found'}, 404)
 
 
 @api_bp.errorhandler(405)
 def method_not_allowed(error):
-    return jsonify({'error': 'Method not allowed'}), 405
+    return _json({'error': 'Method not allowed'}, 405)
 
 
 @api_bp.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return _json({'error': 'Internal server error'}, 500)
 
 
 # Bot webhook routes
@@ -174,34 +192,38 @@ def internal_error(error):
 def webhook():
     """Handle Telegram bot webhook"""
     try:
-        bot_token = current_app.config.get('BOT_TOKEN')
-        if not bot_token:
-            return jsonify({'error': 'Bot token not configured'}), 500
-
-        # Validate webhook request
-        if not validate_telegram_webhook(request, bot_token):
-            return jsonify({'error': 'Invalid webhook request'}), 400
-
-        # Get update data
-        update = request.get_json()
-        if not update:
-            return jsonify({'error': 'No update data'}), 400
-
-        # Initialize bot and handler
-        bot = TelegramBot(bot_token)
-        handler = BotMessageHandler(bot)
-
-        # Process the update
-        success = handler.handle_update(update)
-
-        if success:
-            return jsonify({'status': 'ok'})
+        # Decode the raw body directly instead of going through Flask's
+        # stdlib json parsing
+        raw = request.get_data(cache=False)
+
+        # Every real Telegram update carries update_id - reject garbage
+        # with a cheap substring test before paying for the parse
+        if not raw or b'"update_id"' not in raw:
+            return _json({'error': 'Invalid webhook request'}, 400)
+
+        try:
+            update = _json_loads(raw)
+        except ValueError:
+            update = None
+
+        # Validate webhook update
+        if not update or not validate_telegram_webhook(update):
+            return _json({'error': 'Invalid webhook request'}, 400)
+
+        # Process the update in the background - Telegram only needs a
+        # quick 200, it re-delivers on timeout rather than on slow responses.
+        # When every slot is taken, drop the update (still with a 200, so
+        # Telegram doesn't re-deliver into an already saturated worker)
+        if _webhook_slots.acquire(blocking=False):
+            webhook_executor.submit(_handle_update_and_release, update)
         else:
-            return jsonify({'error': 'Failed to process update'}), 500
+            logger.warning("Webhook backlog full, dropping update")
 
-    except Exception as e:
-        print(f"Webhook error: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _json({'status': 'ok'})
+
+    except Exception:
+        logger.exception("Webhook error")
+        return _json({'error': 'Internal server error'}, 500)
 
 
 # Development routes - NO CORS, NO AUTH, HARDCODED DEV USER
@@ -209,11 +231,10 @@ def webhook():
 def dev_get_user_data():
     """Get or create dev user data - NO CORS, NO AUTH"""
     try:
-        print("DEBUG: Dev route /dev/get_data accessed")
+        logger.debug("Dev route /dev/get_data accessed")
 
         # Handle OPTIONS for CORS preflight
         if request.method == 'OPTIONS':
-            from flask import Response
             response = Response()
             response.headers['Access-Control-Allow-Origin'] = '*'
             response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
@@ -226,8 +247,8 @@ def dev_get_user_data():
         # Check if dev user exists
         existing_user = UserManager.get_user(telegram_id)
         if existing_user:
-            print(f"DEBUG: Returning existing dev user: {existing_user}")
-            response = jsonify({'user': existing_user})
+            logger.debug("Returning existing dev user: %s", existing_user)
+            response = _json({'user': existing_user})
             response.headers['Access-Control-Allow-Origin'] = '*'
             return response
 
@@ -240,27 +261,26 @@ def dev_get_user_data():
             language_code=DEV_USER_LANGUAGE
         )
 
-        print(f"DEBUG: Created new dev user: {new_user}")
-        response = jsonify({'user': new_user})
+        logger.debug("Created new dev user: %s", new_user)
+        response = _json({'user': new_user})
         response.headers['Access-Control-Allow-Origin'] = '*'
         return response
 
-    except Exception as e:
-        print(f"Error in dev_get_user: {e}")
-        response = jsonify({'error': 'Internal server error'})
+    except Exception:
+        logger.exception("Error in dev_get_user")
+        response = _json({'error': 'Internal server error'}, 500)
         response.headers['Access-Control-Allow-Origin'] = '*'
-        return response, 500
+        return response
 
 
 @api_bp.route('/dev/up_data', methods=['POST', 'OPTIONS'])
 def dev_update_user_data():
     """Update dev user data - NO CORS, NO AUTH"""
     try:
-        print("DEBUG: Dev route /dev/up_data accessed")
+        logger.debug("Dev route /dev/up_data accessed")
 
         # Handle OPTIONS for CORS preflight
         if request.method == 'OPTIONS':
-            from flask import Response
             response = Response()
             response.headers['Access-Control-Allow-Origin'] = '*'
             response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
@@ -270,41 +290,41 @@ def dev_update_user_data():
         # Get request data
         update_data = request.get_json()
         if not update_data:
-            response = jsonify({'error': 'No data provided'})
+            response = _json({'error': 'No data provided'}, 400)
             response.headers['Access-Control-Allow-Origin'] = '*'
-            return response, 400
+            return response
 
         # Validate update data
         is_valid, validation_msg = TelegramValidator.validate_user_update_data(update_data)
         if not is_valid:
-            response = jsonify({'error': validation_msg})
+            response = _json({'error': validation_msg}, 400)
             response.headers['Access-Control-Allow-Origin'] = '*'
-            return response, 400
+            return response
 
         # Use hardcoded dev user ID for security
         telegram_id = DEV_USER_ID
 
         # Check if dev user exists
         if not UserManager.user_exists(telegram_id):
-            response = jsonify({'error': 'Dev user not found'})
+            response = _json({'error': 'Dev user not found'}, 404)
             response.headers['Access-Control-Allow-Origin'] = '*'
-            return response, 404
+            return response
 
         # Update dev user
         updated_user = UserManager.update_user(telegram_id, update_data)
         if not updated_user:
-            response = jsonify({'error': 'Failed to update dev user'})
+            response = _json({'error': 'Failed to update dev user'}, 500)
             response.headers['Access-Control-Allow-Origin'] = '*'
-            return response, 500
+            return response
 
-        response = jsonify({'user': updated_user})
+        response = _json({'user': updated_user})
         response.headers['Access-Control-Allow-Origin'] = '*'
         return response
 
-    except Exception as e:
-        print(f"Error in dev_update_user: {e}")
-        response = jsonify({'error': 'Internal server error'})
+    except Exception:
+        logger.exception("Error in dev_update_user")
+        response = _json({'error': 'Internal server error'}, 500)
         response.headers['Access-Control-Allow-Origin'] = '*'
-        return response, 500
+        return response
 
 
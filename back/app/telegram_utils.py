@@ -5,11 +5,31 @@ Telegram utilities for validating init data and parsing responses
 import hashlib
 import hmac
 import json
+import logging
 import urllib.parse
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    # Fall back to stdlib json when orjson isn't installed
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+
+
+@lru_cache(maxsize=4)
+def _secret_key(bot_token: str) -> bytes:
+    """HMAC secret key for WebApp validation - fixed per bot token"""
+    return hmac.new(b"WebAppData", bot_token.encode(), hashlib.sha256).digest()
+
 
 class TelegramAuth:
     """Handle Telegram WebApp authentication"""
@@ -24,46 +44,37 @@ class TelegramAuth:
             return False, None
 
         try:
-            # Alternative implementation based on working GitHub examples
-            from urllib.parse import unquote
+            # parse_qsl handles the splitting and unquoting in one pass
+            vals = dict(urllib.parse.parse_qsl(init_data, keep_blank_values=True))
 
-            # Parse the query string manually
-            vals = {}
-            for pair in init_data.split('&'):
-                if '=' in pair:
-                    key, value = pair.split('=', 1)
-                    vals[key] = unquote(value)
-
-            print(f"DEBUG: Manual parsed data: {vals}")
+            logger.debug("Parsed init data: %s", vals)
 
             # Extract hash
             received_hash = vals.pop('hash', None)
             if not received_hash:
-                print("DEBUG: No hash found in init data")
+                logger.debug("No hash found in init data")
                 return False, None
 
-            print(f"DEBUG: Received hash: {received_hash}")
-
-            # Create data check string (exclude hash only, keep signature)
-            data_check_string = '\n'.join(f"{k}={v}" for k, v in sorted(vals.items()))
+            # Create data check string (exclude hash only, keep signature);
+            # assembled as bytes so it feeds hmac without a second encode
+            data_check_string = b'\n'.join(
+                k.encode() + b'=' + v.encode() for k, v in sorted(vals.items())
+            )
 
-            print(f"DEBUG: Data check string: {repr(data_check_string)}")
+            logger.debug("Data check string: %r", data_check_string)
 
-            # Generate secret key
-            secret_key = hmac.new("WebAppData".encode(), bot_token.encode(), hashlib.sha256).digest()
+            # Secret key is fixed per bot token - cached after the first call
+            secret_key = _secret_key(bot_token)
 
             # Calculate hash
-            calculated_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
-
-            print(f"DEBUG: Calculated hash: {calculated_hash}")
-            print(f"DEBUG: Received hash:   {received_hash}")
-            print(f"DEBUG: Hashes match: {hmac.compare_digest(received_hash, calculated_hash)}")
+            calculated_hash = hmac.new(secret_key, data_check_string, hashlib.sha256).hexdigest()
 
             # Verify hash
             is_valid = hmac.compare_digest(received_hash, calculated_hash)
 
             if not is_valid:
-                print("DEBUG: Hash validation failed!")
+                logger.debug("Hash validation failed: calculated %s, received %s",
+                             calculated_hash, received_hash)
                 return False, None
 
             # Check auth date (optional - ensure request is recent)
@@ -74,20 +85,20 @@ class TelegramAuth:
 
                 # Check if auth is older than 24 hours
                 if current_timestamp - auth_timestamp > 86400:
-                    print("Warning: Auth data is older than 24 hours")
+                    logger.warning("Auth data is older than 24 hours")
 
             # Parse user data
             user_data = None
             if 'user' in vals:
                 try:
-                    user_data = json.loads(vals['user'])
-                except json.JSONDecodeError:
+                    user_data = _json_loads(vals['user'])
+                except ValueError:
                     pass
 
             return True, user_data
 
-        except Exception as e:
-            print(f"Error validating init data: {e}")
+        except Exception:
+            logger.exception("Error validating init data")
             return False, None
 
     @staticmethod
@@ -104,10 +115,10 @@ class TelegramAuth:
             data_dict = dict(parsed_data)
 
             if 'user' in data_dict:
-                return json.loads(data_dict['user'])
+                return _json_loads(data_dict['user'])
 
-        except Exception as e:
-            print(f"Error extracting user from init data: {e}")
+        except Exception:
+            logger.exception("Error extracting user from init data")
 
         return None
 
@@ -119,7 +130,7 @@ class TelegramAuth:
         """
         try:
             if isinstance(response_data, str):
-                response_data = json.loads(response_data)
+                response_data = _json_loads(response_data)
 
             success = response_data.get('ok', False)
             result = response_data.get('result')
@@ -136,6 +147,13 @@ class TelegramAuth:
             return False, None, f"Failed to parse response: {e}"
 
 
+# Telegram user fields we keep when sanitizing - built once at import
+_ALLOWED_USER_FIELDS = frozenset({
+    'id', 'first_name', 'last_name', 'username',
+    'language_code', 'is_bot', 'is_premium'
+})
+
+
 class TelegramValidator:
     """Additional validation utilities"""
 
@@ -154,20 +172,12 @@ class TelegramValidator:
         if not isinstance(user_data, dict):
             return {}
 
-        sanitized = {}
-        allowed_fields = [
-            'id', 'first_name', 'last_name', 'username',
-            'language_code', 'is_bot', 'is_premium'
-        ]
-
-        for field in allowed_fields:
-            if field in user_data:
-                value = user_data[field]
-                # Convert to string and limit length
-                if isinstance(value, (str, int, bool)):
-                    sanitized[field] = str(value)[:100] if field != 'id' else str(value)
-
-        return sanitized
+        # Convert each kept value to string, length-limited except for id
+        return {
+            field: str(user_data[field])[:100] if field != 'id' else str(user_data[field])
+            for field in _ALLOWED_USER_FIELDS & user_data.keys()
+            if isinstance(user_data[field], (str, int, bool))
+        }
 
     @staticmethod
     def validate_user_update_data(data):
@@ -184,10 +194,10 @@ class TelegramValidator:
             if not isinstance(data['user_data'], dict):
                 return False, "user_data must be a dictionary"
 
-            # Check user_data size (limit to prevent abuse)
+            # Check user_data size (limit to prevent abuse) - measure the
+            # serialized bytes directly, no decode to str needed
             try:
-                user_data_str = json.dumps(data['user_data'])
-                if len(user_data_str) > 10000:  # 10KB limit
+                if len(_json_dumps(data['user_data'])) > 10000:  # 10KB limit
                     return False, "user_data is too large (max 10KB)"
             except Exception:
                 return False, "user_data contains invalid JSON data"
@@ -221,7 +231,7 @@ def validate_request_auth(request, bot_token):
     if ENABLE_DEV_USER:
         dev_auth = request.headers.get('X-Dev-Auth')
         if dev_auth == DEV_AUTH_HEADER:
-            print("🚧 DEV USER BYPASS: Using development user")
+            logger.info("🚧 DEV USER BYPASS: Using development user")
             dev_user_data = {
                 'id': DEV_USER_ID,
                 'first_name': DEV_USER_FIRST_NAME,
@@ -251,7 +261,7 @@ def validate_request_auth(request, bot_token):
 
 # Bot webhook message parsing utilities
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """User-friendly message structure for Telegram updates"""
     chat_id: Optional[int] = None
@@ -281,105 +291,64 @@ class Message:
         return any([self.photo, self.video, self.voice, self.document])
 
 
-def flatten_json(nested_json: Dict[str, Any], parent_key: str = '', sep: str = '_') -> Dict[str, Any]:
-    """
-    Flatten a nested json object
-    """
-    items = []
-    for k, v in nested_json.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_json(v, new_key, sep=sep).items())
-        elif isinstance(v, list) and v and isinstance(v[0], dict):
-            # Take the first item if it's a list of dicts (like photos array)
-            items.extend(flatten_json(v[0], new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
-
-
-def get(flat_update: Dict[str, Any], key: str) -> Any:
-    """
-    Get value from flattened update data
-    """
-    return flat_update.get(key)
-
-
 def parse_telegram_update(update: Dict[str, Any]) -> Message:
     """
     Parse Telegram update into user-friendly Message format
-    """
-    flat_update = flatten_json(update)
 
-    # Extract message data (could be from message or callback_query)
+    Reads the handful of fields we need straight out of the nested update
+    instead of flattening the whole dict first.
+    """
     message_data = {}
 
-    # Try to get from direct message
-    if 'message' in update:
-        msg = update['message']
+    msg = update.get('message') or update.get('edited_message')
+    if msg:
+        from_ = msg.get('from', {})
         message_data.update({
-            'chat_id': get(flat_update, 'message_chat_id'),
-            'message_id': get(flat_update, 'message_message_id'),
-            'user_id': get(flat_update, 'message_from_id'),
-            'username': get(flat_update, 'message_from_username'),
-            'first_name': get(flat_update, 'message_from_first_name'),
-            'last_name': get(flat_update, 'message_from_last_name'),
-            'text': get(flat_update, 'message_text'),
+            'chat_id': msg.get('chat', {}).get('id'),
+            'message_id': msg.get('message_id'),
+            'user_id': from_.get('id'),
+            'username': from_.get('username'),
+            'first_name': from_.get('first_name'),
+            'last_name': from_.get('last_name'),
+            'text': msg.get('text'),
         })
 
-        # Handle media
-        if 'photo' in msg:
-            message_data['photo'] = get(flat_update, 'message_photo_file_id')
+        # Handle media - photo is a sized array, take the first entry
+        photo = msg.get('photo')
+        if photo:
+            message_data['photo'] = photo[0].get('file_id')
         if 'video' in msg:
-            message_data['video'] = get(flat_update, 'message_video_file_id')
+            message_data['video'] = msg['video'].get('file_id')
         if 'voice' in msg:
-            message_data['voice'] = get(flat_update, 'message_voice_file_id')
+            message_data['voice'] = msg['voice'].get('file_id')
         if 'document' in msg:
-            message_data['document'] = get(flat_update, 'message_document_file_id')
+            message_data['document'] = msg['document'].get('file_id')
 
-    # Try to get from callback query
     elif 'callback_query' in update:
+        callback = update['callback_query']
+        from_ = callback.get('from', {})
+        callback_msg = callback.get('message', {})
         message_data.update({
-            'chat_id': get(flat_update, 'callback_query_message_chat_id'),
-            'message_id': get(flat_update, 'callback_query_message_message_id'),
-            'user_id': get(flat_update, 'callback_query_from_id'),
-            'username': get(flat_update, 'callback_query_from_username'),
-            'first_name': get(flat_update, 'callback_query_from_first_name'),
-            'last_name': get(flat_update, 'callback_query_from_last_name'),
-            'callback_data': get(flat_update, 'callback_query_data'),
-        })
-
-    # Try to get from edited message
-    elif 'edited_message' in update:
-        message_data.update({
-            'chat_id': get(flat_update, 'edited_message_chat_id'),
-            'message_id': get(flat_update, 'edited_message_message_id'),
-            'user_id': get(flat_update, 'edited_message_from_id'),
-            'username': get(flat_update, 'edited_message_from_username'),
-            'first_name': get(flat_update, 'edited_message_from_first_name'),
-            'last_name': get(flat_update, 'edited_message_from_last_name'),
-            'text': get(flat_update, 'edited_message_text'),
+            'chat_id': callback_msg.get('chat', {}).get('id'),
+            'message_id': callback_msg.get('message_id'),
+            'user_id': from_.get('id'),
+            'username': from_.get('username'),
+            'first_name': from_.get('first_name'),
+            'last_name': from_.get('last_name'),
+            'callback_data': callback.get('data'),
         })
 
     return Message(**message_data)
 
 
-def validate_telegram_webhook(request, bot_token: str) -> bool:
+def validate_telegram_webhook(update: Dict[str, Any]) -> bool:
     """
-    Validate incoming webhook request from Telegram
+    Validate an already-parsed webhook update from Telegram
     Optional: Implement webhook secret validation if needed
     """
-    # For basic validation, check if request contains valid update structure
-    try:
-        data = request.get_json()
-        if not data:
-            return False
-
-        # Check if it has basic Telegram update structure
-        valid_keys = ['update_id', 'message', 'callback_query', 'edited_message', 'channel_post']
-        if not any(key in data for key in valid_keys):
-            return False
+    # For basic validation, check if update has valid Telegram structure
+    if not isinstance(update, dict):
+        return False
 
-        return True
-    except Exception:
-        return False
\ No newline at end of file
+    valid_keys = ['update_id', 'message', 'callback_query', 'edited_message', 'channel_post']
+    return any(key in update for key in valid_keys)
\ No newline at end of file
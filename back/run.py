@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 """
 Main application entry point
+
+Running this file directly starts the Werkzeug dev server - use it for
+local development only. Production (the Dockerfile) serves the same
+`app` object through gunicorn:
+
+    gunicorn -w 2 -k gthread --threads 8 run:app
 """
 
 from app import create_app
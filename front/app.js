@@ -242,6 +242,13 @@ class ArenaApp {
     }
 
     // Display Methods
+    formatTimestamp(ts) {
+        if (!ts) return 'N/A';
+        // Backend stores unix seconds; older records may still hold ISO strings
+        const date = /^\d+$/.test(String(ts)) ? new Date(Number(ts) * 1000) : new Date(ts);
+        return date.toLocaleString();
+    }
+
     displayUserInfo(userData) {
         const userInfoEl = document.getElementById('user-info');
         if (!userInfoEl) return;
@@ -265,11 +272,11 @@ class ArenaApp {
             </div>
             <div class="info-row">
                 <span class="info-label">Created:</span>
-                <span class="info-value">${new Date(userData.created_at).toLocaleString()}</span>
+                <span class="info-value">${this.formatTimestamp(userData.created_at)}</span>
             </div>
             <div class="info-row">
                 <span class="info-label">Updated:</span>
-                <span class="info-value">${new Date(userData.updated_at).toLocaleString()}</span>
+                <span class="info-value">${this.formatTimestamp(userData.updated_at)}</span>
             </div>
         `;
     }